@@ -0,0 +1,31 @@
+"""dbstream - Servidor con redirección directa
+
+Minimiza el tráfico del servidor usando redirects y URLs temporales.
+
+Despliegue: gunicorn con workers gevent (ver gunicorn_conf.py). El servidor
+de desarrollo de Flask atiende una petición a la vez, así que un solo /proxy
+de un MKV largo bloquearía /validate y /direct; con gevent cada worker
+multiplexa cientos de streams concurrentes porque el trabajo es puro I/O.
+
+Modelo de concurrencia: se evaluó portar el módulo a ASGI (Quart/FastAPI +
+httpx), pero gevent ya multiplexa miles de streams por worker con la misma
+API síncrona; el puerto solo aportaría HTTP/2 hacia upstreams compatibles y
+obligaría a reescribir todo el pipeline de streaming. Si algún día hace
+falta HTTP/2, reevaluar entonces.
+
+Módulos:
+    common    - sesión HTTP compartida y headers por host
+    cache     - cache de validación de URLs con dedupe de HEADs
+    classify  - decisión directo-vs-proxy por URL
+    proxy     - la app Flask y sus endpoints
+"""
+
+# El monkey-patch debe ejecutarse antes de importar urllib/sockets para que
+# las lecturas de red cedan el control entre greenlets
+from gevent import monkey
+monkey.patch_all()
+
+from dbstream.common import PORT
+from dbstream.proxy import app
+
+__all__ = ["app", "PORT"]
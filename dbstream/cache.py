@@ -0,0 +1,80 @@
+"""Cache de validación de URLs: TTL acotado, dedupe de HEADs y revalidación
+condicional con ETag/Last-Modified"""
+
+import threading
+
+from cachetools import LRUCache, TTLCache
+
+from dbstream.common import SESSION, USER_AGENT
+
+# Cache de URLs validadas (evita validar repetidamente): acotado y con TTL,
+# protegido por lock porque varios greenlets pueden validar a la vez
+CACHE_TTL = 300  # 5 minutos
+url_cache = TTLCache(maxsize=10000, ttl=CACHE_TTL)
+cache_lock = threading.Lock()
+# Validaciones en curso: solo un greenlet hace el HEAD, el resto espera
+_inflight = {}
+# Validadores HTTP (ETag/Last-Modified) por URL, conservados más allá del TTL:
+# permiten revalidar con un 304 barato en vez de un HEAD completo
+_validators = LRUCache(maxsize=10000)
+
+
+def is_valid_stream_url(url):
+    """Cache de validación para evitar verificaciones repetidas.
+
+    Bajo ráfagas, solo el primer greenlet hace el HEAD por URL; los demás
+    esperan su resultado en vez de duplicar la petición al upstream.
+    """
+    with cache_lock:
+        if url in url_cache:
+            return url_cache[url]
+
+        event = _inflight.get(url)
+        if event is None:
+            event = threading.Event()
+            _inflight[url] = event
+            is_owner = True
+        else:
+            is_owner = False
+
+    if not is_owner:
+        # Otro greenlet ya está validando esta URL: esperar su veredicto
+        event.wait(timeout=6)
+        with cache_lock:
+            return url_cache.get(url, False)
+
+    # Validar URL: si conocemos validadores del upstream, HEAD condicional
+    try:
+        headers = {'User-Agent': USER_AGENT, 'Accept-Encoding': 'identity'}
+        with cache_lock:
+            etag, last_modified = _validators.get(url, (None, None))
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+
+        try:
+            response = SESSION.head(url, headers=headers,
+                                    timeout=5, allow_redirects=True)
+            if response.status_code == 304:
+                # El upstream confirma que nada cambió: válido sin re-probar
+                is_valid = True
+            else:
+                response.raise_for_status()
+                is_valid = True
+                new_etag = response.headers.get('ETag')
+                new_last_modified = response.headers.get('Last-Modified')
+                if new_etag or new_last_modified:
+                    with cache_lock:
+                        _validators[url] = (new_etag, new_last_modified)
+        except Exception:
+            is_valid = False
+
+        # Guardar en cache
+        with cache_lock:
+            url_cache[url] = is_valid
+        return is_valid
+    finally:
+        with cache_lock:
+            _inflight.pop(url, None)
+        event.set()
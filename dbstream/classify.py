@@ -0,0 +1,50 @@
+"""Clasificación de URLs: qué puede redirigirse directo y qué exige proxy"""
+
+import functools
+import os
+import re
+from urllib.parse import urlparse
+
+# Patrones que obligan a usar proxy (archivos pesados): una sola pasada de
+# regex compilada en vez de varios escaneos `in url.lower()`
+FORBIDDEN_RE = re.compile(r'\.(mkv|avi|mp4)|/(movie|serie)/', re.IGNORECASE)
+
+# Hosts IPTV que siempre requieren proxy (necesitan headers específicos);
+# comparación exacta de hostname: un substring en el path o la query ya no
+# clasifica mal la URL
+HOSTS_NEED_PROXY = frozenset({'kcdrdbcx.upne.xyz', 'e98asvyr.okfsdo.xyz'})
+
+# Hosts de confianza (separados por coma en la variable TRUSTED_HOSTS):
+# /direct les responde 302 sin gastar un RTT en validar; si el stream cayó,
+# el propio upstream devolverá el error al cliente
+TRUSTED_HOSTS = frozenset(
+    h.strip() for h in os.environ.get("TRUSTED_HOSTS", "").split(",") if h.strip()
+)
+
+# Extensiones que SÍ funcionan con redirección directa
+DIRECT_EXTS = frozenset({'.m3u8', '.ts'})
+
+
+def needs_proxy(url):
+    """True si la URL exige proxy tradicional en vez de redirección directa"""
+    if FORBIDDEN_RE.search(url):
+        return True
+    return (urlparse(url).hostname or '') in HOSTS_NEED_PROXY
+
+
+@functools.lru_cache(maxsize=4096)
+def can_use_direct(url):
+    """Determina si una URL puede usar redirección directa.
+
+    Función pura sobre la URL, así que se memoiza: los clientes IPTV piden
+    los mismos segmentos una y otra vez y la regex solo corre una vez por URL.
+    """
+    # NUNCA redirección directa para archivos pesados o dominios IPTV específicos
+    if needs_proxy(url):
+        return False
+
+    # Solo la extensión del path: ignora la query string y compara contra el
+    # set en O(1) en vez de escanear/minusculizar la URL completa
+    path = urlparse(url).path
+    dot = path.rfind('.')
+    return dot >= 0 and path[dot:].lower() in DIRECT_EXTS
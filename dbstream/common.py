@@ -0,0 +1,44 @@
+"""Configuración compartida: sesión HTTP con pool y headers por host"""
+
+import logging
+import os
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Configuración
+PORT = int(os.environ.get("PORT", 8000))
+
+logging.basicConfig(level=logging.INFO)
+
+# Sesión compartida con pool de conexiones: reutiliza TCP+TLS entre peticiones
+# al mismo upstream (pool dimensionado acorde a worker_connections)
+SESSION = requests.Session()
+_adapter = HTTPAdapter(pool_connections=100, pool_maxsize=100)
+SESSION.mount("http://", _adapter)
+SESSION.mount("https://", _adapter)
+
+USER_AGENT = 'VLC/3.0.18 LibVLC/3.0.18'
+
+# Headers del proxy construidos una sola vez: base común + extras por host
+# IPTV, resueltos con un lookup de dict en vez de escaneos de substring.
+# Accept-Encoding identity: requests pediría gzip por defecto y el proxy
+# reenvía bytes crudos sin decodificar ni anunciar Content-Encoding
+BASE_HEADERS = {
+    'User-Agent': USER_AGENT,
+    'Accept': '*/*',
+    'Accept-Encoding': 'identity',
+    'Accept-Language': 'es-ES,es;q=0.9,en;q=0.8',
+    'Connection': 'keep-alive',
+    'Cache-Control': 'no-cache'
+}
+HOST_HEADERS = {
+    'kcdrdbcx.upne.xyz': {
+        'Referer': 'https://185.233.16.71/',
+        'Origin': 'https://185.233.16.71'
+    },
+    'e98asvyr.okfsdo.xyz': {
+        'Referer': 'http://185.233.16.71/',
+        'Origin': 'http://185.233.16.71'
+    },
+}
@@ -0,0 +1,343 @@
+"""La app Flask: endpoints /, /direct, /validate y /proxy"""
+
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote, urlparse
+
+import orjson
+import requests
+from flask import Flask, request, Response, jsonify, redirect
+from flask.json.provider import JSONProvider
+from flask_cors import CORS
+
+from dbstream.cache import is_valid_stream_url
+from dbstream.classify import TRUSTED_HOSTS, needs_proxy
+from dbstream.common import BASE_HEADERS, HOST_HEADERS, SESSION, USER_AGENT
+
+app = Flask(__name__)
+CORS(app)
+
+
+class ORJSONProvider(JSONProvider):
+    """jsonify con orjson: serialización en C en vez del json puro-Python.
+
+    Las respuestas pequeñas (/validate, errores) se serializan en cada
+    petición, así que el coste de jsonify sí se nota bajo carga.
+    """
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+app.json = ORJSONProvider(app)
+
+# Headers de cache del upstream que se reenvían al cliente: permiten que
+# reproductores y CDNs intermedios revaliden con 304 en vez de re-descargar
+CACHE_HEADERS = ('ETag', 'Last-Modified', 'Expires', 'Cache-Control')
+
+# Descarga segmentada para archivos grandes sin Range del cliente: varias
+# conexiones Range en paralelo saturan el enlace cuando una sola conexión TCP
+# queda limitada por el producto ancho de banda × RTT del upstream
+PARALLEL_THRESHOLD = 8 * 1024 * 1024   # activar a partir de 8MB
+PARALLEL_SEGMENTS = 4                  # rangos simultáneos
+SEGMENT_SIZE = 4 * 1024 * 1024         # tamaño de cada rango
+
+# Búfers de streaming reutilizados entre peticiones: readinto() escribe sobre
+# el mismo bytearray en vez de materializar un bytes nuevo por cada lectura.
+# El tamaño de lectura arranca en 32KB y se duplica hasta 1MB mientras cada
+# lectura llene el búfer (imitando el slow-start de TCP): un chunk fijo de
+# 32KB limita el throughput a 32KB/RTT con upstreams de latencia alta
+CHUNK_SIZE_MIN = 32 * 1024
+CHUNK_SIZE_MAX = 1 << 20
+_buffer_pool = []
+
+
+def _get_buffer():
+    try:
+        return _buffer_pool.pop()
+    except IndexError:
+        return bytearray(CHUNK_SIZE_MAX)
+
+
+def _put_buffer(buf):
+    # Los búfers son de 1MB: retener como mucho 16 (16MB) entre picos
+    if len(_buffer_pool) < 16:
+        _buffer_pool.append(buf)
+
+
+def _fetch_segment(url, headers, start, end):
+    """Descarga un rango de bytes [start, end] completo a memoria"""
+    seg_headers = dict(headers)
+    seg_headers['Range'] = f'bytes={start}-{end}'
+    response = SESSION.get(url, headers=seg_headers, stream=True, timeout=(5, 30))
+    try:
+        response.raise_for_status()
+        return response.content
+    finally:
+        response.close()
+
+
+def _generate_parallel(url, headers, content_length):
+    """Genera el cuerpo descargando varios rangos en paralelo, en orden.
+
+    Mantiene PARALLEL_SEGMENTS descargas en vuelo y va entregando los
+    segmentos al cliente en orden según se completan.
+    """
+    segments = [(start, min(start + SEGMENT_SIZE, content_length) - 1)
+                for start in range(0, content_length, SEGMENT_SIZE)]
+    total_bytes = 0
+    next_log = 5 * 1024 * 1024
+
+    with ThreadPoolExecutor(max_workers=PARALLEL_SEGMENTS) as pool:
+        pending = deque()
+        idx = 0
+        while idx < len(segments) and len(pending) < PARALLEL_SEGMENTS:
+            pending.append(pool.submit(_fetch_segment, url, headers, *segments[idx]))
+            idx += 1
+
+        while pending:
+            data = pending.popleft().result()
+            if idx < len(segments):
+                pending.append(pool.submit(_fetch_segment, url, headers, *segments[idx]))
+                idx += 1
+
+            yield data
+            total_bytes += len(data)
+            if total_bytes >= next_log:
+                logging.info(f"📊 Transferidos: {total_bytes // (1024*1024)}MB")
+                next_log += 5 * 1024 * 1024
+
+    logging.info(f"✅ Transferencia completada: {total_bytes // (1024*1024)}MB total")
+
+
+# Respuesta de / serializada una sola vez al importar: Railway la golpea
+# constantemente con health checks y el cuerpo nunca cambia
+HOME_BODY = orjson.dumps({
+    "status": "ok",
+    "message": "Servidor DBStream Optimizado",
+    "endpoints": {
+        "direct": "/direct?url=STREAM_URL (solo .m3u8/.ts - redirección directa)",
+        "proxy": "/proxy?url=STREAM_URL (archivos pesados .mkv/.avi/.mp4)",
+        "validate": "/validate?url=STREAM_URL (validar sin transferir)",
+        "auto": "El servidor decide automáticamente qué método usar"
+    },
+    "note": "Archivos pesados y dominios IPTV específicos usan proxy automáticamente"
+})
+
+
+@app.route("/")
+def home():
+    return Response(HOME_BODY, mimetype="application/json")
+
+
+@app.route("/direct")
+def direct_redirect():
+    """Redirección directa - NO consume ancho de banda del servidor"""
+    url = request.args.get("url")
+    if not url:
+        return jsonify({"error": "Parámetro 'url' requerido"}), 400
+
+    # VALIDACIÓN: Archivos pesados DEBEN usar proxy, no redirección directa
+    if needs_proxy(url):
+        logging.warning(f"🚫 Archivo pesado detectado, requiere proxy: {url[:100]}...")
+        return jsonify({
+            "error": "Este tipo de archivo requiere proxy tradicional",
+            "suggestion": "use_proxy",
+            "proxy_url": f"/proxy?url={quote(url)}",
+            "reason": "Archivos .mkv/.avi/.mp4 y URLs de películas necesitan headers específicos"
+        }), 400
+
+    # Hosts de confianza: redirección inmediata sin validación previa
+    if urlparse(url).hostname in TRUSTED_HOSTS:
+        logging.info(f"🔄 Redirección directa (host de confianza): {url[:100]}...")
+        return redirect(url, code=302)
+
+    # Validar URL (solo para streams compatibles)
+    if not is_valid_stream_url(url):
+        return jsonify({"error": "URL no válida o inaccesible"}), 400
+
+    logging.info(f"🔄 Redirección directa a: {url[:100]}...")
+
+    # Redirección 302 - el cliente conecta directamente al stream
+    return redirect(url, code=302)
+
+
+@app.route("/validate")
+def validate_url():
+    """Solo valida si la URL funciona sin transferir datos"""
+    url = request.args.get("url")
+    if not url:
+        return jsonify({"error": "Parámetro 'url' requerido"}), 400
+
+    try:
+        # Solo hacer HEAD request para verificar
+        response = SESSION.head(url,
+                                headers={'User-Agent': USER_AGENT,
+                                         'Accept-Encoding': 'identity'},
+                                timeout=10, allow_redirects=True)
+        response.raise_for_status()
+
+        return jsonify({
+            "status": "valid",
+            "url": url,
+            "content_type": response.headers.get("Content-Type", ""),
+            "content_length": response.headers.get("Content-Length", "unknown")
+        })
+
+    except Exception as e:
+        logging.error(f"❌ Validación falló: {str(e)}")
+        return jsonify({
+            "status": "invalid",
+            "error": str(e)
+        }), 400
+
+
+@app.route("/proxy")
+def proxy():
+    """Proxy tradicional - OPTIMIZADO para archivos pesados (.mkv, .avi, .mp4)"""
+    url = request.args.get("url")
+    if not url:
+        return jsonify({"error": "Parámetro 'url' requerido"}), 400
+
+    logging.info(f"🔄 Proxy para archivo pesado: {url[:100]}...")
+
+    # Headers optimizados según el dominio: base común + extras por host IPTV
+    host = urlparse(url).hostname or ''
+    headers = dict(BASE_HEADERS)
+    host_extra = HOST_HEADERS.get(host)
+    if host_extra:
+        headers.update(host_extra)
+        logging.info(f"🔧 Headers aplicados para {host}")
+
+    # Agregar Range header si lo solicita el cliente
+    range_header = request.headers.get('Range')
+    if range_header:
+        headers['Range'] = range_header
+        logging.info(f"📊 Range request: {range_header}")
+
+    # Reenviar validadores condicionales del cliente: si el upstream responde
+    # 304, el reproductor reutiliza lo que ya tiene sin re-descargar
+    for conditional in ('If-None-Match', 'If-Modified-Since'):
+        value = request.headers.get(conditional)
+        if value:
+            headers[conditional] = value
+
+    try:
+        # stream=True: no descarga el cuerpo; los bytes se leen bajo demanda
+        response = SESSION.get(url, headers=headers, stream=True, timeout=(5, 30))
+
+        if response.status_code == 416:
+            # Rango fuera de límites: reenviar el 416 con Content-Range
+            # para que el reproductor recalibre su posición
+            content_range = response.headers.get('Content-Range')
+            response.close()
+            error_response = Response(status=416)
+            error_response.headers["Access-Control-Allow-Origin"] = "*"
+            if content_range:
+                error_response.headers['Content-Range'] = content_range
+            return error_response
+
+        if response.status_code == 304:
+            # El cliente ya tiene estos bytes: confirmar sin streamear nada
+            not_modified = Response(status=304)
+            not_modified.headers["Access-Control-Allow-Origin"] = "*"
+            for header in CACHE_HEADERS:
+                value = response.headers.get(header)
+                if value:
+                    not_modified.headers[header] = value
+            response.close()
+            return not_modified
+
+        response.raise_for_status()
+
+        content_type = response.headers.get("Content-Type", "application/octet-stream")
+
+        logging.info(f"✅ Conexión exitosa - Content-Type: {content_type}")
+
+        # Archivos grandes sin Range del cliente: descarga segmentada en
+        # paralelo si el upstream acepta rangos y conocemos el tamaño
+        content_length = response.headers.get("Content-Length")
+        if (not range_header and content_length
+                and response.headers.get("Accept-Ranges", "").lower() == "bytes"
+                and int(content_length) >= PARALLEL_THRESHOLD):
+            response.close()
+            logging.info(f"⚡ Descarga paralela en rangos de {SEGMENT_SIZE // (1024*1024)}MB")
+
+            parallel_response = Response(
+                _generate_parallel(url, headers, int(content_length)),
+                content_type=content_type, direct_passthrough=True)
+            parallel_response.headers["Access-Control-Allow-Origin"] = "*"
+            parallel_response.headers["Content-Length"] = content_length
+            parallel_response.headers["Accept-Ranges"] = "bytes"
+            for header in CACHE_HEADERS:
+                value = response.headers.get(header)
+                if value:
+                    parallel_response.headers[header] = value
+            return parallel_response
+
+        def generate():
+            total_bytes = 0
+            next_log = 5 * 1024 * 1024  # log de progreso cada 5MB
+            size = CHUNK_SIZE_MIN
+            buf = _get_buffer()
+            view = memoryview(buf)
+
+            try:
+                while True:
+                    # readinto reutiliza el búfer: una sola copia kernel→Python
+                    n = response.raw.readinto(view[:size])
+                    if not n:
+                        break
+
+                    yield bytes(view[:n])
+                    total_bytes += n
+
+                    # Si la lectura llenó el búfer, el upstream da para más:
+                    # duplicar el tamaño de lectura hasta el máximo
+                    if n == size and size < CHUNK_SIZE_MAX:
+                        size <<= 1
+
+                    if total_bytes >= next_log:
+                        logging.info(f"📊 Transferidos: {total_bytes // (1024*1024)}MB")
+                        next_log += 5 * 1024 * 1024
+            finally:
+                view.release()
+                _put_buffer(buf)
+                response.close()
+
+            logging.info(f"✅ Transferencia completada: {total_bytes // (1024*1024)}MB total")
+
+        # direct_passthrough: werkzeug entrega los chunks tal cual al servidor
+        # WSGI, sin re-codificarlos ni copiarlos en el camino de salida
+        proxy_response = Response(generate(), content_type=content_type,
+                                  direct_passthrough=True)
+        proxy_response.headers["Access-Control-Allow-Origin"] = "*"
+
+        # Pasar headers importantes para reproducción y cache; anunciar
+        # siempre soporte de rangos para que los reproductores puedan buscar
+        for header in ('Content-Length', 'Accept-Ranges', 'Content-Range') + CACHE_HEADERS:
+            value = response.headers.get(header)
+            if value:
+                proxy_response.headers[header] = value
+        proxy_response.headers.setdefault('Accept-Ranges', 'bytes')
+
+        # Reflejar el status del upstream: 206 para contenido parcial
+        if response.status_code == 206:
+            proxy_response.status_code = 206
+
+        return proxy_response
+
+    except requests.HTTPError as e:
+        code = e.response.status_code
+        logging.error(f"❌ HTTPError {code}: {e.response.reason} para {url[:50]}")
+        return jsonify({"error": f"Error HTTP {code}: {e.response.reason}"}), 502
+    except requests.RequestException as e:
+        logging.error(f"❌ Error de conexión: {str(e)} para {url[:50]}")
+        return jsonify({"error": f"Error de conexión: {str(e)}"}), 502
+    except Exception as e:
+        logging.error(f"❌ Error general: {str(e)} para {url[:50]}")
+        return jsonify({"error": "Error interno en el proxy"}), 500
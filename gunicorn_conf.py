@@ -0,0 +1,16 @@
+"""Configuración de gunicorn para el servidor DBStream.
+
+Workers gevent: cada worker multiplexa conexiones I/O-bound, necesario para
+mantener /validate y /direct respondiendo mientras /proxy transfiere MKVs.
+timeout=0 evita que gunicorn mate streams largos (el default de 30s corta
+cualquier transferencia de película a medias).
+"""
+
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 8000)}"
+workers = 2 * multiprocessing.cpu_count() + 1
+worker_class = "gevent"
+worker_connections = 1000
+timeout = 0